@@ -1,60 +1,148 @@
 
+import os
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+import numexpr as ne
+from numba import njit, prange
 
-# Load data
-@st.cache_data
+EXCEL_PATH = "rate_card_data.xlsx"
+PARQUET_PATH = "rate_card_data.parquet"
+
+FILTER_COLS = ["Branch", "Capability", "Department / Team", "Job Title"]
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _revenue12(uplifted, billable, chargeability):
+    # Specialized to the fixed 12-month block: LLVM fully unrolls the inner
+    # loop and vectorizes the fused float32 multiplies
+    out = np.empty_like(billable)
+    for i in prange(uplifted.shape[0]):
+        u = uplifted[i]
+        for j in range(12):
+            out[i, j] = u * billable[i, j] * chargeability[i, j]
+    return out
+
+# Load data. cache_resource shares the frame read-only across sessions
+# without pickling or content-hashing it on every lookup
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("rate_card_data.xls")
+    # Parquet side-cache skips Excel parsing on cold starts; the mtime gate
+    # keeps it from serving a stale copy after the workbook is updated
+    if (os.path.exists(PARQUET_PATH)
+            and os.path.getmtime(PARQUET_PATH) >= os.path.getmtime(EXCEL_PATH)):
+        return pd.read_parquet(PARQUET_PATH, dtype_backend="pyarrow")
+    try:
+        df = pd.read_excel(EXCEL_PATH, engine="calamine")
+    except ImportError:
+        df = pd.read_excel(EXCEL_PATH)
+    # The workbook headers carry stray whitespace (e.g. 'Branch '); some
+    # labels are datetimes, so only strip the strings
+    df.columns = [c.strip() if isinstance(c, str) else c for c in df.columns]
     # Remove rows 107 to 109 (adjusting for zero-based index, these are 106, 107, 108)
     df = df.drop(index=[106, 107, 108], errors='ignore')
+    # Shrink dtypes: low-cardinality strings to category, floats to float32
+    for col in FILTER_COLS:
+        df[col] = df[col].astype("category")
+    float_cols = df.select_dtypes("float64").columns
+    df[float_cols] = df[float_cols].astype("float32")
+    # Arrow-backed columns let st.dataframe serialize without a
+    # numpy-to-Arrow conversion pass
+    df = df.convert_dtypes(dtype_backend="pyarrow")
+    df.to_parquet(PARQUET_PATH, compression="zstd")
     return df
 
+# The frame is immutable after load, so hash it by identity, not content
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def get_filter_options(df):
+    return {col: df[col].dropna().unique().tolist() for col in FILTER_COLS}
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def get_column_blocks(df):
+    # Resolve the positional column blocks once instead of on every rerun
+    billable_cols = df.columns[14:26]
+    chargeability_cols = df.columns[26:38]
+    month_cols = df.columns[38:38 + len(billable_cols)]
+    return billable_cols, chargeability_cols, month_cols
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def get_numeric_blocks(df):
+    # Materialize the 2D numpy blocks once; reruns index these arrays
+    # directly instead of re-slicing the DataFrame through the BlockManager
+    billable = df.iloc[:, 14:26].to_numpy(dtype=np.float32)
+    chargeability = df.iloc[:, 26:38].to_numpy(dtype=np.float32)
+    return billable, chargeability
+
 df = load_data()
+options = get_filter_options(df)
+billable_cols, chargeability_cols, month_cols = get_column_blocks(df)
+billable_block, chargeability_block = get_numeric_blocks(df)
+
+# Memoized on the widget selections, so toggling back to a previous
+# combination returns the cached result instead of recomputing
+@st.cache_data
+def compute_revenue(selected_branch, selected_capability, selected_team,
+                    selected_job, uplift_type, uplift_value):
+    # Apply filters: build one boolean mask, then index once. isin on the
+    # categorical columns compares integer codes and generalizes to
+    # multi-value selections
+    mask = np.ones(len(df), dtype=bool)
+    selections = (selected_branch, selected_capability, selected_team, selected_job)
+    for col, selected in zip(FILTER_COLS, selections):
+        if selected != "All":
+            mask &= df[col].isin([selected]).to_numpy(dtype=bool)
+    # Resolve the mask to row positions once and gather with it everywhere;
+    # take() already returns a fresh copy of just the surviving rows
+    idx = np.flatnonzero(mask)
+    filtered_df = df.take(idx)
+
+    # Calculate uplifted daily rate
+    if uplift_type == "Percentage":
+        filtered_df["Uplifted Rate Daily"] = filtered_df["Charge Rate Daily"] * (1 + uplift_value / 100)
+    else:
+        filtered_df["Uplifted Rate Daily"] = filtered_df["Charge Rate Daily"] + uplift_value
+
+    # Calculate new revenue (billable days already include headcount impact)
+    billable = billable_block[idx]
+    chargeability = chargeability_block[idx]
+    uplifted = filtered_df["Uplifted Rate Daily"].to_numpy(dtype=np.float32)
+
+    if billable.shape[1] == 12:
+        revenue = _revenue12(uplifted, billable, chargeability)
+    else:
+        # numexpr fuses the two multiplies into one threaded pass over memory
+        u = uplifted[:, None]
+        revenue = ne.evaluate("u * billable * chargeability")
+    filtered_df.loc[:, month_cols] = revenue
+
+    # Sum the revenue block in one reduction instead of column-by-column;
+    # nansum keeps pandas' skipna semantics for rows with missing days
+    monthly_totals = pd.Series(np.nansum(revenue, axis=0), index=month_cols)
+    return filtered_df, monthly_totals
 
 # Sidebar filters
 st.sidebar.header("🔧 Uplift Parameters")
-branches = df["Branch"].unique()
-capabilities = df["Capability"].unique()
-teams = df["Department / Team"].unique()
-jobs = df["Job Title"].unique()
-
-selected_branch = st.sidebar.selectbox("Select Branch", ["All"] + list(branches))
-selected_capability = st.sidebar.selectbox("Select Capability", ["All"] + list(capabilities))
-selected_team = st.sidebar.selectbox("Select Department / Team", ["All"] + list(teams))
-selected_job = st.sidebar.selectbox("Select Job Title", ["All"] + list(jobs))
+selected_branch = st.sidebar.selectbox("Select Branch", ["All"] + options["Branch"])
+selected_capability = st.sidebar.selectbox("Select Capability", ["All"] + options["Capability"])
+selected_team = st.sidebar.selectbox("Select Department / Team", ["All"] + options["Department / Team"])
+selected_job = st.sidebar.selectbox("Select Job Title", ["All"] + options["Job Title"])
 
 uplift_type = st.sidebar.radio("Uplift Type", ["Percentage", "Fixed $ per Day"])
 uplift_value = st.sidebar.number_input("Enter uplift value", value=0.0)
 
-# Apply filters
-filtered_df = df.copy()
-if selected_branch != "All":
-    filtered_df = filtered_df[filtered_df["Branch"] == selected_branch]
-if selected_capability != "All":
-    filtered_df = filtered_df[filtered_df["Capability"] == selected_capability]
-if selected_team != "All":
-    filtered_df = filtered_df[filtered_df["Department / Team"] == selected_team]
-if selected_job != "All":
-    filtered_df = filtered_df[filtered_df["Job Title"] == selected_job]
-
-# Calculate uplifted daily rate
-if uplift_type == "Percentage":
-    filtered_df["Uplifted Rate Daily"] = filtered_df["Charge Rate Daily"] * (1 + uplift_value / 100)
-else:
-    filtered_df["Uplifted Rate Daily"] = filtered_df["Charge Rate Daily"] + uplift_value
-
-# Calculate new revenue (billable days already include headcount impact)
-billable_cols = filtered_df.columns[14:26]
-chargeability_cols = filtered_df.columns[26:38]
-
-for month, bill_col, chg_col in zip(filtered_df.columns[38:], billable_cols, chargeability_cols):
-    filtered_df[month] = filtered_df["Uplifted Rate Daily"] * filtered_df[bill_col] * filtered_df[chg_col]
+filtered_df, monthly_totals = compute_revenue(
+    selected_branch, selected_capability, selected_team,
+    selected_job, uplift_type, uplift_value)
 
 # Summary
-monthly_totals = filtered_df[filtered_df.columns[38:]].sum()
 st.subheader("📊 Monthly Revenue Summary")
 st.dataframe(monthly_totals)
 
 st.subheader("📋 Detailed Data")
-st.dataframe(filtered_df)
+# Format currency client-side via Arrow column config; a pandas Styler here
+# would render HTML for every cell on every rerun
+currency_config = {
+    col: st.column_config.NumberColumn(format="$%.0f")
+    for col in ["Charge Rate Daily", "Uplifted Rate Daily", *month_cols]
+}
+st.dataframe(filtered_df, column_config=currency_config)